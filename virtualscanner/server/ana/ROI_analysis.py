@@ -76,8 +76,8 @@ def main(dicom_map_path: Path, map_type: str, map_size: str, fov: str,
     sphere_std : numpy.ndarray
         Std for all spheres in sphere number order
     """
-    map_size = np.ndarray.item(np.fromstring(map_size, dtype=int, sep=','))
-    fov = np.ndarray.item(np.fromstring(fov, dtype=int, sep=','))
+    map_size = np.array(map_size.split(','), dtype=int).item()
+    fov = np.array(fov.split(','), dtype=int).item()
     num_spheres = 14
     voxel_size = fov / map_size  # unit should be mm/voxel
     sphere_all_loc_template = np.zeros([num_spheres, 2])
@@ -122,15 +122,15 @@ def main(dicom_map_path: Path, map_type: str, map_size: str, fov: str,
             if ".dcm" in filename.lower():  # check whether the file's DICOM
                 lstFilesDCM.append(os.path.join(dirName, filename))
 
-    ref_image = pydicom.read_file(lstFilesDCM[0])  # Get ref file
+    ref_image = pydicom.dcmread(lstFilesDCM[0], stop_before_pixels=True,
+                                specific_tags=[0x00280010, 0x00280011])  # Get ref file (Rows and Columns only)
     image_size = (int(ref_image.Rows), int(ref_image.Columns), len(lstFilesDCM))  # Load dimensions
-    map_data_final = np.zeros(image_size, dtype=ref_image.pixel_array.dtype)
+    map_data_final = np.zeros(image_size, dtype=np.float64)
 
-    for filenameDCM in lstFilesDCM:
-        ds = pydicom.read_file(filenameDCM)  # read the file, data type is uint16 (0~65535)
-        map_data_final[:, :, lstFilesDCM.index(filenameDCM)] = ds.pixel_array
+    for i, filenameDCM in enumerate(lstFilesDCM):
+        ds = pydicom.dcmread(filenameDCM)  # read the file, data type is uint16 (0~65535)
+        map_data_final[:, :, i] = ds.pixel_array
 
-    map_data_final = map_data_final.astype(np.float64)  # convert data type
     for n1 in range(image_size[2]):
         map_data_final[:, :, n1] = np.divide(map_data_final[:, :, n1], np.amax(map_data_final[:, :, n1]))
         map_data_final[:, :, n1] = np.multiply(map_data_final[:, :, n1],
@@ -2,6 +2,7 @@
 
 import os
 import time
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 
 import matplotlib as mpl
@@ -10,7 +11,6 @@ mpl.use('TkAgg')
 import matplotlib.pyplot as plt
 import numpy as np
 import pydicom
-from scipy.optimize import curve_fit
 
 from virtualscanner.utils import constants
 
@@ -42,39 +42,37 @@ def main(dicom_file_path: Path, TR: str, TE: str, TI: str, pat_id: str):  # TI s
     dicom_map_path : str
         path of T1_map in dicom format
     """
-    TR = np.fromstring(TR, dtype=int, sep=',')
-    TE = np.fromstring(TE, dtype=float, sep=',')
-    TI = np.fromstring(TI, dtype=float, sep=',')
+    TR = np.array(TR.split(','), dtype=int)
+    TE = np.array(TE.split(','), dtype=float)
+    TI = np.array(TI.split(','), dtype=float)
     TR = TR / 1000
     TE = TE / 1000
     TI = TI / 1000
 
     lstFilesDCM = sorted(list(dicom_file_path.glob('*.dcm')))
-    ref_image = pydicom.read_file(str(lstFilesDCM[0]))  # Get ref file
-    image_size = (int(ref_image.Rows), int(ref_image.Columns), len(
-        lstFilesDCM))  # Load dimensions based on the number of rows, columns, and slices (along the Z axis)
-    image_data_final = np.zeros(image_size, dtype=ref_image.pixel_array.dtype)
-
-    for filenameDCM in lstFilesDCM:
-        ds = pydicom.read_file(str(filenameDCM))  # read the file
-        image_data_final[:, :, lstFilesDCM.index(filenameDCM)] = ds.pixel_array  # store the raw image data (uint16)
-    image_data_final = image_data_final.astype(np.float64)  # convert data type
+    # Order slices by InstanceNumber so that they line up with TI; without it, file name order is kept
+    instance_numbers = [pydicom.dcmread(str(filenameDCM), stop_before_pixels=True,
+                                        specific_tags=[0x00200013]).get('InstanceNumber')
+                        for filenameDCM in lstFilesDCM]
+    if None not in instance_numbers:
+        lstFilesDCM = [lstFilesDCM[i] for i in np.argsort(instance_numbers, kind='stable')]
+    # Read and decode the slices concurrently; pydicom releases the GIL during file I/O and decoding
+    with ThreadPoolExecutor(max_workers=min(8, len(lstFilesDCM))) as executor:
+        slices = list(executor.map(lambda filenameDCM: pydicom.dcmread(str(filenameDCM)).pixel_array, lstFilesDCM))
+    # Slices along the Z axis in their native dtype, converted to float64 once
+    image_data_final = np.stack(slices, axis=-1).astype(np.float64, copy=False)
+    del slices
+    image_size = image_data_final.shape
 
     # image_data_final = np.divide(image_data_final, np.amax(image_data_final))
-    image_data_final = image_data_final/1000
-    T1_map = np.zeros([image_size[0], image_size[1]])
-
-    for n2 in range(image_size[0]):
-        for n3 in range(image_size[1]):
-            y_data = image_data_final[n2, n3, :]
-            n4 = 0
-            min_loc = np.argmin(y_data)
-            while n4 <= min_loc:
-                y_data[n4] = -y_data[n4]
-                n4 = n4 + 1
-            popt, pcov = curve_fit(T1_sig_eq, (TI, TR), y_data,
-                                   p0=(0.991966876997438, 0.526367507137759, 0.961046087302673), bounds=([0, 0, -1], [10, 6, 6]))
-            T1_map[n2, n3] = popt[1]
+    image_data_final /= 1000
+    # Flip the sign of all points up to the inversion null, then fit every pixel at once
+    y_data = image_data_final.reshape(-1, image_size[2])
+    min_loc = np.argmin(y_data, axis=1)
+    np.negative(y_data, out=y_data, where=np.arange(image_size[2]) <= min_loc[:, None])
+    popt = T1_fit(y_data, TI, TR, p0=(0.991966876997438, 0.526367507137759, 0.961046087302673),
+                  bounds=([0, 0, -1], [10, 6, 6]))
+    T1_map = popt[:, 1].reshape(image_size[0], image_size[1])
 
     T1_map[T1_map > 5] = 5
 
@@ -116,6 +114,7 @@ def main(dicom_file_path: Path, TR: str, TE: str, TI: str, pat_id: str):  # TI s
 
     pixel_array = (T1_map / 5) * 65535
     pixel_array_int = pixel_array.astype(np.uint16)
+    ds = pydicom.dcmread(str(lstFilesDCM[-1]))  # header of the last slice is used for the map
     ds.PixelData = pixel_array_int.tostring()
     ds.save_as(str(dicom_map_path) + '/T1_map' + timestr + '.dcm')
 
@@ -144,3 +143,116 @@ def T1_sig_eq(X, a, b, c):
     """
     x, y = X
     return a * (1 - 2 * np.exp(-x / b) + np.exp(-y / b)) + c
+
+
+def T1_sig_jac(X, a, b, c):
+    """
+    Generate the analytic Jacobian of T1_sig_eq with respect to the curve fitting parameters.
+
+    Parameters
+    ----------
+    X : float
+        Independent variable
+    a : float
+        Curve fitting parameters
+    b : float
+        Curve fitting parameters
+    c : float
+        Curve fitting parameters
+
+    Returns
+    -------
+    numpy.ndarray
+        Partial derivatives with respect to (a, b, c), stacked along the last axis
+    """
+    x, y = X
+    E1 = np.exp(-x / b)
+    E2 = np.exp(-y / b)
+    return np.stack((1 - 2 * E1 + E2, a * (-2 * x * E1 + y * E2) / b ** 2, np.ones_like(E1)), axis=-1)
+
+
+def T1_fit(y_data, TI, TR, p0, bounds, max_iter=200, xtol=1e-10, tile_size=4096):
+    """
+    Fit T1_sig_eq to all pixels with a batched, bounded Levenberg-Marquardt iteration, one tile of pixels at a time.
+
+    Parameters
+    ----------
+    y_data : numpy.ndarray
+        Npix x NTI array of (sign-corrected) signal values, one row per pixel
+    TI : numpy.ndarray
+        TI values in seconds
+    TR : numpy.ndarray
+        TR values in seconds
+    p0 : tuple
+        Initial guess (a, b, c) shared by all pixels
+    bounds : tuple
+        Lower and upper bounds ([a, b, c], [a, b, c]) of the fitting parameters
+    max_iter : int, optional
+        Maximum number of iterations; default is 200
+    xtol : float, optional
+        Relative parameter change below which a pixel is considered converged; default is 1e-10
+    tile_size : int, optional
+        Number of pixels fitted together, which bounds the working set of each iteration; default is 4096
+
+    Returns
+    -------
+    popt : numpy.ndarray
+        Npix x 3 array of fitted parameters (a, b, c)
+    """
+    lb = np.array(bounds[0], dtype=float)
+    ub = np.array(bounds[1], dtype=float)
+    lb[1] = max(lb[1], 1e-6)  # T1 = 0 is not defined by the model
+
+    popt = np.empty((y_data.shape[0], 3))
+    for start in range(0, y_data.shape[0], tile_size):
+        tile = slice(start, start + tile_size)
+        popt[tile] = _T1_fit_tile(y_data[tile], TI, TR, p0, lb, ub, max_iter, xtol)
+
+    return popt
+
+
+def _T1_fit_tile(y_data, TI, TR, p0, lb, ub, max_iter, xtol):
+    """
+    Batched, bounded Levenberg-Marquardt fit of T1_sig_eq for one tile of pixels; see T1_fit.
+    """
+    popt = np.tile(np.asarray(p0, dtype=float), (y_data.shape[0], 1))
+    lam = np.full(y_data.shape[0], 1e-3)
+    res = T1_sig_eq((TI, TR), popt[:, 0:1], popt[:, 1:2], popt[:, 2:3]) - y_data
+    cost = np.einsum('ij,ij->i', res, res)
+
+    active = np.arange(y_data.shape[0])
+    for _ in range(max_iter):
+        if active.size == 0:
+            break
+        p = popt[active]
+        a, b, c = p[:, 0:1], p[:, 1:2], p[:, 2:3]
+
+        J = T1_sig_jac((TI, TR), a, b, c)
+        JtJ = np.einsum('nki,nkj->nij', J, J)
+        grad = np.einsum('nki,nk->ni', J, res[active])
+
+        # Hold parameters that sit on a bound and are pushed outwards
+        free = ~(((p <= lb) & (grad > 0)) | ((p >= ub) & (grad < 0)))
+        JtJ = JtJ * (free[:, :, None] & free[:, None, :])
+        damping = lam[active, None] * np.einsum('nii->ni', JtJ) + 1e-12 + ~free
+        step = np.linalg.solve(JtJ + damping[:, :, None] * np.eye(3), (grad * free)[:, :, None])[:, :, 0]
+
+        # Do not let T1 drop by more than a decade per iteration; its Jacobian column vanishes near zero
+        p_lb = np.tile(lb, (active.size, 1))
+        p_lb[:, 1] = np.maximum(lb[1], 0.1 * p[:, 1])
+        p_new = np.clip(p - step, p_lb, ub)
+        res_new = T1_sig_eq((TI, TR), p_new[:, 0:1], p_new[:, 1:2], p_new[:, 2:3]) - y_data[active]
+        cost_new = np.einsum('ij,ij->i', res_new, res_new)
+
+        better = cost_new < cost[active]
+        accepted = active[better]
+        popt[accepted] = p_new[better]
+        res[accepted] = res_new[better]
+        cost[accepted] = cost_new[better]
+        lam[active] = np.where(better, lam[active] / 10, lam[active] * 10)
+
+        dp = np.abs(p_new - p).max(axis=1)
+        converged = (better & (dp <= xtol * (np.abs(p).max(axis=1) + xtol))) | (lam[active] > 1e12)
+        active = active[~converged]
+
+    return popt
@@ -40,22 +40,22 @@ def main(dicom_file_path: Path, TR: str, TE: str, pat_id: str):
     dicom_map_path : str
         Path of T2 map in dicom format
     """
-    TR = np.fromstring(TR, dtype=int, sep=',')
-    TE_acq1 = np.fromstring(TE, dtype=float, sep=',')
+    TR = np.array(TR.split(','), dtype=int)
+    TE_acq1 = np.array(TE.split(','), dtype=float)
     TE_acq2 = np.array([12, 15, 18, 21])
     TR = TR / 1000
     TE_acq1 = TE_acq1 / 1000
     TE_acq2 = TE_acq2 / 1000
 
     lstFilesDCM = sorted(list(dicom_file_path.glob('*.dcm')))  # create an empty list
-    ref_image = pydicom.read_file(str(lstFilesDCM[0]))  # Get ref file
+    ref_image = pydicom.dcmread(str(lstFilesDCM[0]), stop_before_pixels=True,
+                                specific_tags=[0x00280010, 0x00280011])  # Get ref file (Rows and Columns only)
     image_size = (int(ref_image.Rows), int(ref_image.Columns), len(lstFilesDCM))  # Load dimensions
-    image_data_final = np.zeros(image_size, dtype=ref_image.pixel_array.dtype)
+    image_data_final = np.zeros(image_size, dtype=np.float64)
 
-    for filenameDCM in lstFilesDCM:
-        ds = pydicom.read_file(str(filenameDCM))  # read the file, data type is uint16 (0~65535)
-        image_data_final[:, :, lstFilesDCM.index(filenameDCM)] = ds.pixel_array
-    image_data_final = image_data_final.astype(np.float64)  # convert data type
+    for i, filenameDCM in enumerate(lstFilesDCM):
+        ds = pydicom.dcmread(str(filenameDCM))  # read the file, data type is uint16 (0~65535)
+        image_data_final[:, :, i] = ds.pixel_array
     image_data_final_acq1 = image_data_final[:, :, :7]
     image_data_final_acq2 = image_data_final[:, :, 7:]  # to separate two acqs
 
@@ -144,16 +144,21 @@ if __name__ == '__main__':
     # Get seq info
     seq_info = blcsim.store_pulseq_commands(myseq)
 
-    # Initiate multiprocessing pool
-    pool = mp.Pool(mp.cpu_count())
-
-    # Multiprocessing simulation
-    results = pool.starmap_async(blcsim.sim_single_spingroup,
-                                 [(loc_ind, GAMMA_BAR * dBmap(myphantom.get_location(loc_ind)), myphantom, seq_info) for
-                                  loc_ind in loc_ind_list]).get()
-    pool.close()
-    # Add up signal across all SpinGroups
-    raw_signal = np.sum(results, axis=0)
+    # Split SpinGroups into chunks; each chunk is simulated at once
+    freq_offsets = [GAMMA_BAR * dBmap(myphantom.get_location(loc_ind)) for loc_ind in loc_ind_list]
+    num_workers = mp.cpu_count()
+    chunk_size = -(-len(loc_ind_list) // (4 * num_workers))
+    chunks = [(loc_ind_list[k:k + chunk_size], freq_offsets[k:k + chunk_size])
+              for k in range(0, len(loc_ind_list), chunk_size)]
+
+    # Multiprocessing simulation; phantom and seq info are sent to each worker only once
+    # Signal is added up across all SpinGroups as the chunks complete
+    raw_signal = None
+    with mp.Pool(num_workers, initializer=blcsim.init_sim_worker, initargs=(myphantom, seq_info)) as pool:
+        for chunk_signal in pool.imap_unordered(blcsim.sim_spingroups_chunk, chunks):
+            if raw_signal is None:
+                raw_signal = np.zeros(np.shape(chunk_signal), dtype=complex)
+            raw_signal += chunk_signal
 
     # Time the code: Toc
     print("Simulation complete!")
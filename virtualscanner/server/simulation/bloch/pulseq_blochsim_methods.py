@@ -32,46 +32,82 @@ def store_pulseq_commands(seq):
     dt_rf = seq.system.rf_raster_time
     seq_params = []
 
+    # Event table of all blocks (delay, rf, gx, gy, gz, adc) and the case each block falls into
+    keys = list(events.keys())
+    event_table = np.array([events[key] for key in keys])
+    block_types = np.select([event_table[:, 0] != 0, event_table[:, 1] != 0, event_table[:, 5] != 0,
+                             np.any(event_table[:, 2:5] != 0, axis=1)], ['d', 'p', 'r', 'g'], default='')
+
     commands = ''
+    # Blocks with identical event IDs are identical, so each distinct block is only parsed once
+    block_cache = {}
     # Go through pulseq block by block and store commands
-    for key in events.keys():
-        event_row = events[key]
-        this_blk = seq.get_block(key)
-
-        # Case 1: Delay
-        if event_row[0] != 0:
-            commands += 'd'
-            seq_params.append([this_blk['delay'].delay[0]])
-        # Case 2: rf pulse
-        elif event_row[1] != 0:
-            commands += 'p'
-            rf_time = np.array(this_blk['rf'].t[0]) - dt_rf
-            df = this_blk['rf'].freq_offset
-            b1 = np.multiply(np.exp(-2 * pi * 1j * df * rf_time), this_blk['rf'].signal / GAMMA_BAR)
-            rf_grad, rf_timing, rf_duration = combine_gradients(blk=this_blk, timing=rf_time)
-            seq_params.append([b1, rf_grad, dt_rf])
-
-        # Case 3: ADC sampling
-        elif event_row[5] != 0:
-            commands += 'r'
-            adc = this_blk['adc']
-            dt_adc = adc.dwell
-            delay = adc.delay
-            grad, timing, duration = combine_gradients(blk=this_blk, dt=dt_adc, delay=delay)
-            seq_params.append([dt_adc, int(adc.num_samples), delay, grad, timing])
+    for key, event_row, cstr in zip(keys, event_table, block_types):
+        if cstr == '':
+            continue
+        row_id = tuple(event_row)
+        if row_id in block_cache:
+            cpars = block_cache[row_id]
+        else:
+            cpars = _get_block_params(seq.get_block(key), cstr, dt_grad, dt_rf)
+            block_cache[row_id] = cpars
 
-        # Case 4: just gradients
-        elif event_row[2] != 0 or event_row[3] != 0 or event_row[4] != 0:
-            commands += 'g'
-            # Process gradients
-            fp_grads_area = combine_gradient_areas(blk=this_blk)
-            dur = find_precessing_time(blk=this_blk, dt=dt_grad)
-            seq_params.append([fp_grads_area, dur])
+        if cstr == 'd' and commands.endswith('d'):
+            # Consecutive delays add up to a single delay
+            seq_params[-1] = [seq_params[-1][0] + cpars[0]]
+        else:
+            commands += cstr
+            seq_params.append(cpars)
 
     seq_info = {'commands': commands, 'params': seq_params, 'grad_raster_time': dt_grad}
     return seq_info
 
 
+def _get_block_params(this_blk, cstr, dt_grad, dt_rf):
+    """Helper function that parses a single pulseq block into parameters for apply_pulseq_commands()
+
+    Parameters
+    ----------
+    this_blk : dict
+        Pulseq block obtained from seq.get_block()
+    cstr : str
+        Command of the block: 'd' (delay), 'p' (rf pulse), 'r' (readout) or 'g' (just gradients)
+    dt_grad : float
+        Gradient raster time in seconds
+    dt_rf : float
+        RF raster time in seconds
+
+    Returns
+    -------
+    cpars : list
+        Parameters of the command
+
+    """
+    # Case 1: Delay
+    if cstr == 'd':
+        cpars = [this_blk['delay'].delay[0]]
+    # Case 2: rf pulse
+    elif cstr == 'p':
+        rf_time = np.array(this_blk['rf'].t[0]) - dt_rf
+        df = this_blk['rf'].freq_offset
+        b1 = np.multiply(np.exp(-2 * pi * 1j * df * rf_time), this_blk['rf'].signal / GAMMA_BAR)
+        rf_grad, rf_timing, rf_duration = combine_gradients(blk=this_blk, timing=rf_time)
+        cpars = [b1, rf_grad, dt_rf]
+    # Case 3: ADC sampling
+    elif cstr == 'r':
+        adc = this_blk['adc']
+        dt_adc = adc.dwell
+        delay = adc.delay
+        grad, timing, duration = combine_gradients(blk=this_blk, dt=dt_adc, delay=delay)
+        cpars = [dt_adc, int(adc.num_samples), delay, grad, timing]
+    # Case 4: just gradients
+    else:
+        fp_grads_area = combine_gradient_areas(blk=this_blk)
+        dur = find_precessing_time(blk=this_blk, dt=dt_grad)
+        cpars = [fp_grads_area, dur]
+    return cpars
+
+
 def apply_pulseq_commands(isc, seq_info):
     """Imposes sequence commands on a single spin group
 
@@ -189,6 +225,67 @@ def sim_single_spingroup(loc_ind, freq_offset, phantom, seq_info):
     return isc.signal
 
 
+def sim_spingroups_batch(loc_ind_list, freq_offset, phantom, seq_info):
+    """Function for applying a seq on many spin groups at once and retrieving their summed signal
+
+    Parameters
+    ----------
+    loc_ind_list : list
+        Indices in phantom of the spin groups
+    freq_offset : float or numpy.ndarray
+        Off-resonance in Hertz, either shared or one per spin group
+    phantom : Phantom
+        Phantom where spin groups are located
+    seq_info : dict
+        Commands generated by store_pulseq_commands() from a pulseq object
+
+    Returns
+    -------
+    signal : numpy.ndarray
+        Complex signal of all readouts, summed across the spin groups
+    """
+    locs = [phantom.get_location(loc_ind) for loc_ind in loc_ind_list]
+    params = [phantom.get_params(loc_ind) for loc_ind in loc_ind_list]
+    isc = sg.SpinGroupBatch(loc=locs, pdt1t2=params, df=freq_offset)
+    apply_pulseq_commands(isc, seq_info)
+    return np.array(isc.signal)
+
+
+def init_sim_worker(phantom, seq_info):
+    """Initializer for multiprocessing pool workers that keeps the phantom and sequence commands in the worker
+
+    This way only the spin group indices are sent with each task, see sim_spingroups_chunk()
+
+    Parameters
+    ----------
+    phantom : Phantom
+        Phantom where spin groups are located
+    seq_info : dict
+        Commands generated by store_pulseq_commands() from a pulseq object
+
+    """
+    global _worker_phantom, _worker_seq_info
+    _worker_phantom = phantom
+    _worker_seq_info = seq_info
+
+
+def sim_spingroups_chunk(chunk):
+    """Worker function for simulating a chunk of spin groups in a pool initialized with init_sim_worker()
+
+    Parameters
+    ----------
+    chunk : tuple
+        (loc_ind_list, freq_offset) as used by sim_spingroups_batch()
+
+    Returns
+    -------
+    signal : numpy.ndarray
+        Complex signal of all readouts, summed across the spin groups in the chunk
+    """
+    loc_ind_list, freq_offset = chunk
+    return sim_spingroups_batch(loc_ind_list, freq_offset, _worker_phantom, _worker_seq_info)
+
+
 # Helpers
 def combine_gradient_areas(blk):
     """Helper function that combines gradient areas in a pulseq block
@@ -259,21 +356,20 @@ def combine_gradients(blk, dt=0, timing=(), delay=0):
         duration = timing[-1] - timing[0]
         grad_timing = timing
 
-    grad = []
+    # Contiguous 3 x N array; each gradient axis is one row
+    grad = np.zeros((3, len(grad_timing)))
 
     # Interpolate gradient values at desired time points
-    for g_name in ['gx', 'gy', 'gz']:
+    for k, g_name in enumerate(['gx', 'gy', 'gz']):
         if blk.__contains__(g_name):
             g = blk[g_name]
             g_time, g_shape = ([0, g.rise_time, g.rise_time + g.flat_time, g.rise_time + g.flat_time + g.fall_time],
                                [0, g.amplitude / GAMMA_BAR, g.amplitude / GAMMA_BAR, 0]) if g.type == 'trap' \
                 else (g.t, g.waveform / GAMMA_BAR)
             g_time = np.array(g_time)
-            grad.append(np.interp(x=grad_timing, xp=g_time, fp=g_shape))
-        else:
-            grad.append(np.zeros(np.shape(grad_timing)))
+            grad[k] = np.interp(x=grad_timing, xp=g_time, fp=g_shape)
 
-    return np.array(grad), grad_timing, duration
+    return grad, grad_timing, duration
 
 
 def find_precessing_time(blk, dt):
@@ -4,7 +4,6 @@ Unit test for bloch simulation on pulseq EPI sequence (2D Cartesian, rectangular
 Run the script to generated a simulated image. Modify the code directly to set the phantom and acquisition parameters.
 """
 
-import multiprocessing as mp
 import time
 
 
@@ -56,14 +55,8 @@ if __name__ == '__main__':
     seq_info = blcsim.store_pulseq_commands(myseq)
     # Get list of locations from phantom
     loc_ind_list = myphantom.get_list_inds()
-    # Initiate multiprocessing pool
-    pool = mp.Pool(mp.cpu_count())
-    # Parallel CPU simulationprint
-    results = pool.starmap_async(blcsim.sim_single_spingroup,
-                                 [(loc_ind, df, myphantom, seq_info) for loc_ind in loc_ind_list]).get()
-    pool.close()
-    # Add up signal across all SpinGroups
-    my_signal = np.sum(results, axis=0)
+    # Simulate all SpinGroups at once; signal is added up across them
+    my_signal = blcsim.sim_spingroups_batch(loc_ind_list, df, myphantom, seq_info)
     # Time the code: Toc
     print("Time used: %s seconds" % (time.time() - start_time))
 
@@ -90,10 +90,11 @@ class SpinGroup:
         C, S = np.cos(phi), np.sin(phi)
         E1 = 1 if self.T1 == 0 else np.exp(-t / self.T1)
         E2 = 1 if self.T2 == 0 else np.exp(-t / self.T2)
-        A = np.array([[E2 * C, E2 * S, 0],
-                      [-E2 * S, E2 * C, 0],
-                      [0, 0, E1]])
-        self.m = A @ self.m + [[0], [0], [1 - E1]]
+        # Closed-form solution: rotation about z by phi, then T2 decay and T1 recovery
+        mx, my, mz = self.m[:, 0]
+        self.m = np.array([[E2 * (C * mx + S * my)],
+                           [E2 * (C * my - S * mx)],
+                           [E1 * mz + 1 - E1]])
 
     def delay(self, t):
         """Applies a time passage to the spin group
@@ -112,10 +113,10 @@ class SpinGroup:
         E1 = 1 if self.T1 == 0 else np.exp(-t / self.T1)
         E2 = 1 if self.T2 == 0 else np.exp(-t / self.T2)
 
-        A = np.array([[E2, E2, 0],
-                      [-E2, E2, 0],
-                      [0, 0, E1]])
-        self.m = A @ self.m + np.array([[0], [0], [1 - E1]])
+        mx, my, mz = self.m[:, 0]
+        self.m = np.array([[E2 * mx],
+                           [E2 * my],
+                           [E1 * mz + 1 - E1]])
 
     def apply_rf(self, pulse_shape, grads_shape, dt):
         """Applies an RF pulse
@@ -196,16 +197,160 @@ class SpinGroup:
             Timing of gradient waveform
 
         """
+        m_samples, self.m = _readout_magnetization(self.m, np.reshape(self.loc, (3, 1)), self.df, self.T1, self.T2,
+                                                   dwell, n, delay, grad, timing)
+        self.signal.append(self.PD * m_samples[:, 0])
 
-        signal_1D = []
-        # ADC delay
-        self.fpwg(np.trapz(y=grad[:, 0:2], x=timing[0:2]), delay)
-        for q in range(1, len(timing)):
-            if q <= n:
-                signal_1D.append(self.get_m_signal())
-            self.fpwg(np.trapz(y=grad[:, q:q + 2], dx=dwell), dwell)
 
-        self.signal.append(signal_1D)
+class SpinGroupBatch:
+    """Structure-of-arrays collection of spin groups for Bloch simulation
+
+    Holds the state of many spin groups as contiguous arrays and applies each operation to all of them at once.
+    Methods mirror those of SpinGroup, so the same pulseq commands can be applied to either.
+
+    Parameters
+    ----------
+    loc : numpy.ndarray
+        N x 3 array of (x,y,z) locations from isocenter in meters
+    pdt1t2 : numpy.ndarray
+        N x 3 array of (PD,T1,T2)
+        Proton density between 0 and 1
+        T1, T2 in seconds; if zero it signifies no relaxation
+    df : float or numpy.ndarray, optional
+        Off-resonance in Hertz, either shared or one per spin group; default is 0
+
+    Attributes
+    ----------
+    m : numpy.ndarray
+        [Mx, My, Mz]
+        3 x N array of magnetization
+    PD : numpy.ndarray
+        Proton densities between 0 and 1 that scale the signal
+    T1 : numpy.ndarray
+        Longitudinal relaxation times in seconds
+    T2 : numpy.ndarray
+        Transverse relaxation times in seconds
+    loc : numpy.ndarray
+        3 x N array of spin group locations from isocenter in meters
+    df : numpy.ndarray
+        Off-resonance in Hertz
+    signal : list
+        Complex signal summed over all spin groups, one array per readout; only generated by self.readout()
+
+    """
+
+    def __init__(self, loc, pdt1t2, df=0):
+        loc = np.asarray(loc, dtype=float).reshape(-1, 3)
+        pdt1t2 = np.asarray(pdt1t2, dtype=float).reshape(-1, 3)
+        num_spins = loc.shape[0]
+        self.m = np.zeros((3, num_spins))
+        self.m[2] = 1
+        self.PD = pdt1t2[:, 0]
+        self.T1 = np.maximum(0, pdt1t2[:, 1])
+        self.T2 = np.maximum(0, pdt1t2[:, 2])
+        self.loc = np.ascontiguousarray(loc.T)
+        self.df = np.broadcast_to(np.asarray(df, dtype=float), (num_spins,))
+        self.signal = []
+
+    def get_m_signal(self):
+        """Gets the transverse magnetization summed over all spin groups
+
+        Returns
+        -------
+        m_signal : complex
+            Real part      = Mx
+            Imaginary part = My
+
+        """
+        return np.sum(self.PD * (self.m[0] + 1j * self.m[1]))
+
+    def fpwg(self, grad_area, t):
+        """Apply only gradients to all spin groups
+
+        Parameters
+        ----------
+        grad_area : numpy.ndarray
+            [Gx_area, Gy_area, Gz_area]
+            Total area under Gx, Gy, and Gz in seconds*Tesla/meter
+        t : float
+            Total time of precession in seconds
+
+        """
+        phi = GAMMA * (grad_area[0] * self.loc[0] + grad_area[1] * self.loc[1] + grad_area[2] * self.loc[2]) \
+              + 2 * np.pi * self.df * t
+        C, S = np.cos(phi), np.sin(phi)
+        E1 = _relaxation(t, self.T1)
+        E2 = _relaxation(t, self.T2)
+        mx, my, mz = self.m
+        self.m = np.array([E2 * (C * mx + S * my),
+                           E2 * (C * my - S * mx),
+                           E1 * mz + 1 - E1])
+
+    def delay(self, t):
+        """Applies a time passage to all spin groups
+
+        Parameters
+        ----------
+        t : float
+            Delay interval in seconds
+
+        """
+        E1 = _relaxation(t, self.T1)
+        E2 = _relaxation(t, self.T2)
+        mx, my, mz = self.m
+        self.m = np.array([E2 * mx,
+                           E2 * my,
+                           E1 * mz + 1 - E1])
+
+    def apply_rf(self, pulse_shape, grads_shape, dt):
+        """Applies an RF pulse to all spin groups
+
+        Euler's method numerical integration of Bloch equation, as in SpinGroup.apply_rf()
+
+        Parameters
+        ----------
+        pulse_shape :
+            1 x n complex array (B1)[tesla]
+        grads_shape :
+            3 x n real array  [tesla/meter]
+        dt:
+            raster time for both shapes [seconds]
+
+        """
+        mx, my, mz = self.m
+        glocp_all = np.asarray(grads_shape).T @ self.loc
+        for v in range(len(pulse_shape)):
+            B1x = dt * GAMMA * np.real(pulse_shape[v])
+            B1y = dt * GAMMA * np.imag(pulse_shape[v])
+            glocp = dt * GAMMA * glocp_all[v]
+            mx, my, mz = mx + glocp * my + B1y * mz, my - glocp * mx + B1x * mz, mz + B1y * mx - B1x * my
+        self.m = np.array([mx, my, mz])
+
+    def readout(self, dwell, n, delay, grad, timing):
+        """ADC sampling for all spin groups
+
+        Samples the summed magnetization while playing an arbitrary gradient, as in SpinGroup.readout()
+        This data is then stored in self.signal
+
+        Parameters
+        ----------
+        dwell : float
+            Constant sampling interval in seconds
+        n : int
+            Number of samples
+        delay : float
+            Delay of the first point sampled relative to beginning of gradient waveform
+        grad : numpy.ndarray
+            2D array with shape 3 x m (i.e. m samples of the 3D gradient (Gx, Gy, Gz))
+            Arbitrary gradient waveform in Tesla/meter
+        timing : numpy.ndarray
+            1D array with length m
+            Timing of gradient waveform
+
+        """
+        m_samples, self.m = _readout_magnetization(self.m, self.loc, self.df, self.T1, self.T2,
+                                                   dwell, n, delay, grad, timing)
+        self.signal.append(m_samples @ self.PD)
 
 
 # Helpers
@@ -243,3 +388,69 @@ def anyrot(v):
         R = np.array([[1, 0, 0], [0, 1, 0], [0, 0, 1]])
 
     return R
+
+
+def _relaxation(t, T):
+    """Helper method that returns the relaxation factor exp(-t/T), or 1 wherever T is zero (no relaxation)
+
+    Parameters
+    ----------
+    t : float or numpy.ndarray
+        Time interval in seconds
+    T : numpy.ndarray
+        Relaxation times in seconds
+
+    Returns
+    -------
+    E : numpy.ndarray
+        Relaxation factors broadcast over t and T
+
+    """
+    T_safe = np.where(T == 0, 1, T)
+    return np.where(T == 0, 1, np.exp(-t / T_safe))
+
+
+def _readout_magnetization(m, loc, df, T1, T2, dwell, n, delay, grad, timing):
+    """Helper method that free-precesses spin groups through an ADC readout, shared by both readout() methods
+
+    Parameters
+    ----------
+    m : numpy.ndarray
+        3 x N array of magnetization at the start of the readout
+    loc : numpy.ndarray
+        3 x N array of spin group locations from isocenter in meters
+    df : float or numpy.ndarray
+        Off-resonance in Hertz
+    T1 : float or numpy.ndarray
+        Longitudinal relaxation times in seconds; zero signifies no relaxation
+    T2 : float or numpy.ndarray
+        Transverse relaxation times in seconds; zero signifies no relaxation
+    dwell, n, delay, grad, timing
+        ADC and gradient parameters, see SpinGroup.readout()
+
+    Returns
+    -------
+    m_samples : numpy.ndarray
+        min(n, len(timing) - 1) x N complex array of sampled transverse magnetization (Mx + 1j*My)
+    m_end : numpy.ndarray
+        3 x N array of magnetization at the end of the readout
+
+    """
+    # Gradient area and duration of each free precession interval: the ADC delay, then one dwell per sample
+    num_steps = len(timing)
+    grad_area = np.zeros((3, num_steps))
+    grad_area[:, 0] = np.trapz(y=grad[:, 0:2], x=timing[0:2])
+    grad_area[:, 1:-1] = 0.5 * dwell * (grad[:, 1:-1] + grad[:, 2:])
+    t = np.full(num_steps, dwell)
+    t[0] = delay
+
+    # Successive fpwg() steps commute, so the magnetization after each step follows
+    # from the cumulative phase and the cumulative relaxation time (num_steps x N)
+    phi = np.cumsum(GAMMA * (grad_area.T @ loc) + 2 * np.pi * np.outer(t, df), axis=0)
+    t = np.cumsum(t)
+    E1 = _relaxation(t[-1], T1)
+    E2 = _relaxation(t[:, np.newaxis], T2)
+    m_xy = (m[0] + 1j * m[1]) * E2 * np.exp(-1j * phi)
+
+    m_end = np.array([np.real(m_xy[-1]), np.imag(m_xy[-1]), 1 - (1 - m[2]) * E1])
+    return m_xy[:min(n, num_steps - 1)], m_end
@@ -3,7 +3,6 @@ import virtualscanner.server.simulation.bloch.pulseq_library as psl
 from pypulseq.Sequence.sequence import Sequence
 from virtualscanner.utils import constants
 import time
-import multiprocessing as mp
 import virtualscanner.server.simulation.bloch.caller_script_blochsim as caller
 import virtualscanner.server.simulation.bloch.pulseq_bloch_simulator as simulator
 import virtualscanner.server.simulation.bloch.pulseq_blochsim_methods as blcsim
@@ -76,15 +75,9 @@ def sim_sequence(seq):
     seq_info = blcsim.store_pulseq_commands(seq)
     # Get list of locations from phantom
     loc_ind_list = phantom.get_list_inds()
-    # Initiate multiprocessing pool
-    pool = mp.Pool(mp.cpu_count())
-    # Parallel simulation
+    # Simulate all SpinGroups at once; signal is added up across them
     df = 0
-    results = pool.starmap_async(blcsim.sim_single_spingroup,
-                                 [(loc_ind, df, phantom, seq_info) for loc_ind in loc_ind_list]).get()
-    pool.close()
-    # Add up signal across all SpinGroups
-    signal = np.sum(results, axis=0)
+    signal = blcsim.sim_spingroups_batch(loc_ind_list, df, phantom, seq_info)
 
     # Time the code: Toc
     print("Time used: %s seconds" % (time.time() - start_time))
@@ -67,5 +67,43 @@ class TestSpinGroupFunctions(unittest.TestCase):
         np.testing.assert_array_equal(spin.m, [[np.exp(-5)],[0],[1-np.exp(-0.5)]])
 
 
+    def test_delay(self):
+        # Delay only relaxes: no rotation of the transverse magnetization
+        spin = sg.SpinGroup(loc=(0.01,0.02,0),pdt1t2=(1,1,0.1),df=0)
+        spin.m = np.array([[0.6],[0.3],[0.2]])
+        spin.delay(t=0.05)
+        E1, E2 = np.exp(-0.05), np.exp(-0.5)
+
+        np.testing.assert_allclose(spin.m, [[E2*0.6],[E2*0.3],[1-(1-0.2)*E1]], rtol=1e-12)
+
+
+    def test_batch(self):
+        # Spin groups simulated together give the summed signal of spin groups simulated one by one
+        locs = [(0.01,0,0),(0,-0.02,0.005),(0.03,0.01,0)]
+        params = [(1,1,0.1),(0.5,0,0),(0.8,2,0.2)]
+        dfs = [0,10,-20]
+        dt = 10e-6
+        grad = np.tile([[0.02],[0.01],[0]], 11)
+        timing = np.arange(0,11*dt,dt)
+        grads_shape = np.tile([[0],[0],[0.001]], 50)
+        pulse_shape = np.full(50, 1e-6 + 0.5e-6j)
+
+        spins = [sg.SpinGroup(loc=locs[k],pdt1t2=params[k],df=dfs[k]) for k in range(3)]
+        for spin in spins:
+            spin.apply_rf(pulse_shape=pulse_shape, grads_shape=grads_shape, dt=dt)
+            spin.delay(t=0.01)
+            spin.fpwg(grad_area=np.array([1e-5,0,2e-5]), t=0.002)
+            spin.readout(dwell=dt, n=10, delay=dt/2, grad=grad, timing=timing)
+
+        batch = sg.SpinGroupBatch(loc=locs,pdt1t2=params,df=dfs)
+        batch.apply_rf(pulse_shape=pulse_shape, grads_shape=grads_shape, dt=dt)
+        batch.delay(t=0.01)
+        batch.fpwg(grad_area=np.array([1e-5,0,2e-5]), t=0.002)
+        batch.readout(dwell=dt, n=10, delay=dt/2, grad=grad, timing=timing)
+
+        np.testing.assert_allclose(batch.signal[0], np.sum([np.squeeze(spin.signal) for spin in spins], axis=0))
+        np.testing.assert_allclose(batch.m, np.hstack([spin.m for spin in spins]), atol=1e-12)
+
+
 if __name__ == "__main__":
     unittest.main()